@@ -1,4 +1,5 @@
 import os
+import asyncio
 from typing import List
 import json
 import re
@@ -9,6 +10,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+_JSON_FENCE_RE = re.compile(r"```(?:json)?([\s\S]*?)```", re.MULTILINE)
+
 class RepositoryContent(BaseModel):
     """Schema for repository content generated by AI"""
     description: str = Field(
@@ -106,22 +109,21 @@ class RepoContentGenerator:
 
     def extract_json_from_response(self, response_content: str) -> str:
         """Extract JSON content from markdown code blocks"""
-        json_matches = list(re.finditer(r"```(?:json)?([\s\S]*?)```", response_content, re.MULTILINE))
-        if json_matches:
-            # Use the last match
-            return json_matches[-1].group(1).strip()
-        return response_content.strip()
+        # Keep only the last match instead of materializing all of them
+        last = None
+        for last in _JSON_FENCE_RE.finditer(response_content):
+            pass
+        return last.group(1).strip() if last else response_content.strip()
 
-    def generate_content(self, repo_name: str, prd_content: str) -> RepositoryContent:
-        """Generate repository content from PRD"""
-        prompt = f"""
+    def _build_prompt(self, repo_name: str, prd_content: str) -> str:
+        return f"""
         Please analyze this PRD and generate stakeholder-focused repository content for '{repo_name}':
         ```markdown
         {prd_content}
         ```
         """
 
-        response = self.agent.run(prompt)
+    def _parse_response(self, response) -> RepositoryContent:
         if not response or not response.content:
             raise ValueError("Failed to generate repository content")
             
@@ -139,6 +141,20 @@ class RepoContentGenerator:
         except Exception as e:
             raise ValueError(f"Failed to parse agent response: {str(e)}")
 
+    async def agenerate_content(self, repo_name: str, prd_content: str) -> RepositoryContent:
+        """Generate repository content from PRD without blocking the event loop"""
+        response = await self.agent.arun(self._build_prompt(repo_name, prd_content))
+        return self._parse_response(response)
+
+    def generate_content(self, repo_name: str, prd_content: str) -> RepositoryContent:
+        """Generate repository content from PRD (blocking; prefer agenerate_content in async code)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.agenerate_content(repo_name, prd_content))
+        # Called from inside a running loop: fall back to the blocking agent call
+        return self._parse_response(self.agent.run(self._build_prompt(repo_name, prd_content)))
+
     def format_readme(self, repo_name: str, content: RepositoryContent) -> str:
         """Return the README content directly since it's already formatted"""
         return content.readme_content 
\ No newline at end of file
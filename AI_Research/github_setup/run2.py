@@ -185,7 +185,7 @@ async def setup_github_project(tasks_json, github_token, prd_content=None, use_e
     # Generate repository content using Agno AI
     print("🤖 Generating repository content with AI...")
     content_generator = RepoContentGenerator()
-    repo_content: RepositoryContent = content_generator.generate_content(repo_name, prd_content or "No PRD provided")
+    repo_content: RepositoryContent = await content_generator.agenerate_content(repo_name, prd_content or "No PRD provided")
     readme_content = content_generator.format_readme(repo_name, repo_content)
     
     # Create repository if not using existing one
@@ -2,10 +2,10 @@ import os
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from .services.brd_generator import BRDGeneratorService
-from .services.prd_generator import PRDGeneratorService
+from .services.prd_generator import get_prd_generator
 from .services.task_generator import TaskGeneratorService
 from .services.market_validation import MarketValidationService
-from .services.github_setup import GitHubSetupService
+from .services.github_setup import get_github_setup_service
 from .services.preview_generator import PreviewGeneratorService
 # Load environment variables
 load_dotenv()
@@ -34,8 +34,8 @@ CORS_ORIGINS = [
 # Initialize AI services once to be reused across the application
 # Create singleton service instances
 brd_service = BRDGeneratorService()
-prd_service = PRDGeneratorService()
+prd_service = get_prd_generator()
 task_service = TaskGeneratorService()
 market_validation_service = MarketValidationService() 
-github_setup_service = GitHubSetupService()
+github_setup_service = get_github_setup_service()
 preview_service = PreviewGeneratorService()
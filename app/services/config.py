@@ -22,6 +22,9 @@ DEFAULT_MODEL_ID = os.getenv("DEFAULT_MODEL_ID", "llama-3.3-70b-versatile")
 PRD_MODEL_TYPE = os.getenv("PRD_MODEL_TYPE", DEFAULT_MODEL_TYPE)
 PRD_MODEL_ID = os.getenv("PRD_MODEL_ID", DEFAULT_MODEL_ID)
 
+# Max concurrent LLM calls for PRD batch generation (keep within provider rate limits)
+PRD_BATCH_CONCURRENCY = int(os.getenv("PRD_BATCH_CONCURRENCY", "4"))
+
 # BRD Generator model settings
 BRD_MODEL_TYPE = os.getenv("BRD_MODEL_TYPE", DEFAULT_MODEL_TYPE)
 BRD_MODEL_ID = os.getenv("BRD_MODEL_ID", DEFAULT_MODEL_ID)
@@ -60,6 +63,22 @@ ENABLE_MARKDOWN = os.getenv("ENABLE_MARKDOWN", "True").lower() == "true"
 RESULTS_DIR = os.getenv("RESULTS_DIR", "results")
 os.makedirs(RESULTS_DIR, exist_ok=True)
 
+# Response cache settings (Redis when REDIS_URL is set, SQLite otherwise)
+ENABLE_RESPONSE_CACHE = os.getenv("ENABLE_RESPONSE_CACHE", "True").lower() == "true"
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+REDIS_URL = os.getenv("REDIS_URL", None)
+RESPONSE_CACHE_DB_PATH = os.getenv("RESPONSE_CACHE_DB_PATH", os.path.join(RESULTS_DIR, "response_cache.sqlite3"))
+
+# LLM call retry settings (exponential backoff between attempts)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+
+# Semantic response cache settings (requires OPENAI_API_KEY for embeddings)
+ENABLE_SEMANTIC_CACHE = os.getenv("ENABLE_SEMANTIC_CACHE", "False").lower() == "true"
+SEMANTIC_CACHE_EMBEDDING_MODEL = os.getenv("SEMANTIC_CACHE_EMBEDDING_MODEL", "text-embedding-3-small")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "200"))
+
 # Patchright Configuration
 LOVABLE_COOKIES = os.getenv("LOVABLE_COOKIES")
 WS_CDP_ENDPOINT = os.getenv("WS_CDP_ENDPOINT")
@@ -7,6 +7,7 @@ import re
 import asyncio
 import aiohttp
 import datetime
+import functools
 from typing import Dict, Any
 from pydantic import BaseModel, Field
 from github import Github
@@ -20,6 +21,8 @@ from agno.models.openai.like import OpenAILike
 from agno.memory.v2.schema import UserMemory
 
 from app.services.memory_storage_service import get_memory, get_storage
+from app.services import response_cache
+from app.utils.ai_utils import retry_async, is_transient_error
 
 from .config import (
     GITHUB_MODEL_TYPE,
@@ -40,6 +43,7 @@ logger = logging.getLogger(__name__)
 
 # Constants
 CREDITS = "Created by TaskFlow"
+_JSON_FENCE_RE = re.compile(r"```(?:json)?([\s\S]*?)```", re.MULTILINE)
 
 class RepositoryContent(BaseModel):
     """Schema for repository content generated by AI"""
@@ -52,6 +56,82 @@ class RepositoryContent(BaseModel):
         description="Complete README content in markdown format"
     )
 
+# Computed once at import and serialized with sorted keys so the instructions
+# prefix is byte-identical across requests and processes for provider prompt caching
+_REPO_CONTENT_SCHEMA_JSON = json.dumps(RepositoryContent.model_json_schema(), sort_keys=True)
+
+# Built once at import: the instructions are static, so every agent shares the same
+# prompt prefix
+_REPO_INSTRUCTIONS = f"""
+You are TaskFlow's GitHub repository setup expert. Your role is to:
+1. Create well-structured repositories for projects
+2. Set up proper project documentation
+3. Configure repository settings and labels
+4. Create initial project structure
+
+Follow these guidelines:
+1. Create clear, professional documentation
+2. Set up proper project structure based on the tech stack
+3. Configure meaningful labels and milestones
+4. Ensure all setup follows GitHub best practices
+
+README sections to include (in order):
+# [Project Name]
+1. 🎯 Project Title and Description
+   - Brief introduction
+   - Project objectives
+   - Target completion timeline
+
+2. 👥 Target Users
+   - List primary user groups
+   - Key user characteristics
+   - User requirements
+
+3. 🌟 Key Features
+   - List high-priority features
+   - Include priority level
+   - Brief description of each feature
+   - User stories or acceptance criteria if provided
+
+4. 🔧 Technical Overview
+   - Architecture components
+   - Technology stack
+   - Infrastructure requirements
+
+5. ⚙️ Non-Functional Requirements
+   - Performance metrics
+   - Security requirements
+   - Scalability requirements
+   - Other relevant NFRs from PRD
+
+6. 📊 Project Scope
+   - Budget information (if public)
+   - Team composition
+   - Project timeline
+   - Key limitations or constraints
+
+7. ✅ Acceptance Criteria
+   - Key success metrics
+   - Required certifications
+   - Testing requirements
+
+Important guidelines:
+- Include ONLY information present in the PRD
+- Maintain the same level of detail as the PRD
+- Keep technical specifications if mentioned
+- Exclude implementation details unless specified in PRD
+- Do NOT add speculative information
+- Do NOT include setup/installation unless in PRD
+
+Required Output Format:
+You must respond with a JSON object that matches this Pydantic model schema:
+{_REPO_CONTENT_SCHEMA_JSON}
+
+Focus on information valuable to stakeholders and project starters.
+Include ONLY information that is present in the PRD.
+Do NOT include setup, usage, license, or contact information.
+"""
+
 class GitHubSetupService:
     """Service for setting up GitHub repositories."""
 
@@ -90,75 +170,7 @@ class GitHubSetupService:
             storage=self.storage,
             name="GitHubSetup",
             description="A technical writer specialized in creating comprehensive GitHub repository documentation based on PRD content",
-            instructions=f"""
-            You are TaskFlow's GitHub repository setup expert. Your role is to:
-            1. Create well-structured repositories for projects
-            2. Set up proper project documentation
-            3. Configure repository settings and labels
-            4. Create initial project structure
-            
-            Follow these guidelines:
-            1. Create clear, professional documentation
-            2. Set up proper project structure based on the tech stack
-            3. Configure meaningful labels and milestones
-            4. Ensure all setup follows GitHub best practices
-            
-            README sections to include (in order):
-            # [Project Name]
-            1. 🎯 Project Title and Description
-               - Brief introduction
-               - Project objectives
-               - Target completion timeline
-            
-            2. 👥 Target Users
-               - List primary user groups
-               - Key user characteristics
-               - User requirements
-            
-            3. 🌟 Key Features
-               - List high-priority features
-               - Include priority level
-               - Brief description of each feature
-               - User stories or acceptance criteria if provided
-            
-            4. 🔧 Technical Overview
-               - Architecture components
-               - Technology stack
-               - Infrastructure requirements
-            
-            5. ⚙️ Non-Functional Requirements
-               - Performance metrics
-               - Security requirements
-               - Scalability requirements
-               - Other relevant NFRs from PRD
-            
-            6. 📊 Project Scope
-               - Budget information (if public)
-               - Team composition
-               - Project timeline
-               - Key limitations or constraints
-            
-            7. ✅ Acceptance Criteria
-               - Key success metrics
-               - Required certifications
-               - Testing requirements
-            
-            Important guidelines:
-            - Include ONLY information present in the PRD
-            - Maintain the same level of detail as the PRD
-            - Keep technical specifications if mentioned
-            - Exclude implementation details unless specified in PRD
-            - Do NOT add speculative information
-            - Do NOT include setup/installation unless in PRD
-
-            Required Output Format:
-            You must respond with a JSON object that matches this Pydantic model schema:
-            {RepositoryContent.model_json_schema()}
-            
-            Focus on information valuable to stakeholders and project starters.
-            Include ONLY information that is present in the PRD.
-            Do NOT include setup, usage, license, or contact information.
-            """,
+            instructions=_REPO_INSTRUCTIONS,
             add_datetime_to_instructions=True,
             show_tool_calls=ENABLE_SHOW_TOOL_CALLS,
             debug_mode=ENABLE_DEBUG_MODE,
@@ -168,11 +180,28 @@ class GitHubSetupService:
         logger.info(f"Initialized GitHub Setup with {self.model_type} model (ID: {self.model_id})")
 
     def extract_json_from_response(self, response_content: str) -> str:
-        """Extract JSON content from markdown code blocks"""
-        json_matches = list(re.finditer(r"```(?:json)?([\s\S]*?)```", response_content, re.MULTILINE))
-        if json_matches:
-            # Use the last match
-            return json_matches[-1].group(1).strip()
+        """Extract JSON content from the last markdown code block"""
+        # Single pass over the lines, remembering only the last closed fence
+        lines = response_content.splitlines()
+        in_fence = False
+        current_start = 0
+        last_block = None
+        for i, line in enumerate(lines):
+            if line.lstrip().startswith("```"):
+                if in_fence:
+                    last_block = (current_start, i)
+                else:
+                    current_start = i + 1
+                in_fence = not in_fence
+        if last_block:
+            start, end = last_block
+            return "\n".join(lines[start:end]).strip()
+        # Fences that do not sit on their own lines (e.g. ```json {...}```)
+        last_match = None
+        for last_match in _JSON_FENCE_RE.finditer(response_content):
+            pass
+        if last_match:
+            return last_match.group(1).strip()
         return response_content.strip()
 
     async def generate_repo_content(self, repo_name: str, prd_content: str, project_id: str = None) -> RepositoryContent:
@@ -184,6 +213,60 @@ class GitHubSetupService:
         ```
         """
 
+        # Identical PRDs are served from the response cache instead of the LLM, and
+        # concurrent identical requests share one in-flight call. The key covers the
+        # PRD only: repo names carry a timestamp, so the cached content is renamed
+        # from the repo it was generated for to repo_name instead
+        if not response_cache.is_cacheable(self.model):
+            return await self._generate_repo_content(prompt, project_id)
+
+        cache_key = response_cache.make_key(self.model_id, self.agent.instructions, prd_content)
+        cached = await self._get_cached_repo_content(cache_key)
+        if cached is not None:
+            logger.info(f"Repository content cache hit for: {repo_name}")
+            generated_for, repo_content = cached
+        else:
+            generated_for, repo_content = await response_cache.coalesce(
+                cache_key, lambda: self._generate_and_cache_repo_content(prompt, repo_name, project_id, cache_key)
+            )
+        return self._rename_repo_content(repo_content, generated_for, repo_name)
+
+    async def _get_cached_repo_content(self, cache_key: str):
+        """Return the cached (repo name generated for, content) pair, or None on miss"""
+        cached = await response_cache.get(cache_key)
+        if cached is None:
+            return None
+        cached = json.loads(cached)
+        return cached["repo_name"], RepositoryContent.model_validate(cached["content"])
+
+    def _rename_repo_content(self, repo_content: RepositoryContent, old_name: str, new_name: str) -> RepositoryContent:
+        """Point repository content generated for old_name at new_name"""
+        if old_name == new_name:
+            return repo_content
+        return RepositoryContent(
+            description=repo_content.description.replace(old_name, new_name),
+            readme_content=repo_content.readme_content.replace(old_name, new_name),
+        )
+
+    async def _generate_and_cache_repo_content(self, prompt: str, repo_name: str, project_id: str, cache_key: str):
+        """Generate repository content and cache it together with the repo name it was generated for"""
+        # A generation that finished just before this one was coalesced may have filled the cache
+        cached = await self._get_cached_repo_content(cache_key)
+        if cached is not None:
+            return cached
+        repo_content = await self._generate_repo_content(prompt, project_id)
+        await response_cache.set(cache_key, json.dumps({"repo_name": repo_name, "content": repo_content.model_dump()}))
+        return repo_name, repo_content
+
+    async def _generate_repo_content(self, prompt: str, project_id: str = None) -> RepositoryContent:
+        """Generate repository content, retrying transient errors and unparsable responses"""
+        return await retry_async(
+            lambda: self._request_repo_content(prompt, project_id),
+            retry_if=lambda e: isinstance(e, ValueError) or is_transient_error(e),
+        )
+
+    async def _request_repo_content(self, prompt: str, project_id: str = None) -> RepositoryContent:
+        """Call the LLM once and parse the repository content"""
         response = await self.agent.arun(
             prompt,
             user_id=project_id,
@@ -197,8 +280,7 @@ class GitHubSetupService:
             if isinstance(response.content, str):
                 # Extract JSON from markdown code blocks if present
                 json_content = self.extract_json_from_response(response.content)
-                content_dict = json.loads(json_content)
-                return RepositoryContent(**content_dict)
+                return RepositoryContent.model_validate_json(json_content)
             elif isinstance(response.content, RepositoryContent):
                 return response.content
             else:
@@ -463,4 +545,14 @@ class GitHubSetupService:
             return {
                 "status": "error",
                 "error": str(e)
-            } 
\ No newline at end of file
+            }
+
+
+@functools.lru_cache(maxsize=None)
+def _get_github_setup_service(model_type: str, model_id: str) -> GitHubSetupService:
+    return GitHubSetupService(model_type, model_id)
+
+
+def get_github_setup_service(model_type: str = None, model_id: str = None) -> GitHubSetupService:
+    """Return the shared GitHubSetupService for a model, creating it on first use."""
+    return _get_github_setup_service(model_type or GITHUB_MODEL_TYPE, model_id or GITHUB_MODEL_ID)
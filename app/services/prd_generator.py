@@ -1,24 +1,26 @@
 """
 PRD Generator service for generating Product Requirements Documents.
 """
+import asyncio
+import functools
+import importlib.resources
 import logging
-import os
-import re
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List, AsyncIterator, Optional, Tuple
 
 from agno.agent import Agent
-from agno.models.groq import Groq
-from agno.models.google import Gemini
-from agno.models.openai import OpenAIChat
-from agno.models.mistral import MistralChat
-from agno.models.openai.like import OpenAILike
+from agno.memory.v2.memory import Memory
 from agno.memory.v2.schema import UserMemory
+from agno.run.response import RunEvent
 
 from app.services.memory_storage_service import get_memory, get_storage
+from app.services import response_cache, semantic_cache
+from app.utils.ai_utils import retry_async
 
 from .config import (
     PRD_MODEL_TYPE,
     PRD_MODEL_ID,
+    PRD_BATCH_CONCURRENCY,
     ENABLE_DEBUG_MODE,
     ENABLE_SHOW_TOOL_CALLS,
     ENABLE_MARKDOWN,
@@ -34,6 +36,222 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _load_prd_template() -> str:
+    """Load the PRD template used as a reference in the agent instructions."""
+    try:
+        return (importlib.resources.files("app.services") / "templates" / "prd_template.md").read_text(encoding="utf-8")
+    except Exception as e:
+        logger.warning(f"PRD template loading failed: {e}. Proceeding without template.")
+        return ""
+
+
+# Read once per process instead of on every service construction
+_PRD_TEMPLATE = _load_prd_template()
+
+# Built once at import: the instructions are static, so every agent shares the same
+# prompt prefix
+_PRD_INSTRUCTIONS = f"""
+You are TaskFlow, an expert product manager. Based on the provided Business Requirements Document (BRD),
+create a comprehensive Product Requirements Document (PRD) in markdown format.
+
+PRD Template Reference:
+```markdown
+{_PRD_TEMPLATE}
+```
+
+Create a detailed PRD following the structure of the template provided. Your PRD should include these sections with similar formatting and level of detail:
+
+# PRODUCT REQUIREMENTS DOCUMENT (PRD)
+
+## [Project Name]
+
+### Introduction
+[Brief introduction based on the BRD]
+
+### Product Description
+[Detailed description of the product]
+
+### Product Objective
+[Key objectives from the BRD]
+
+### Target User
+[Detailed breakdown of target users with demographics]
+
+### Functional Requirements
+[Organize by feature categories, similar to the template]
+
+For each functional requirement, include:
+- Priority (High/Medium/Low)
+- Description
+- User Story (As a [user], I want to [action] so that [benefit])
+- Acceptance Criteria (bullets of testable requirements)
+
+### Non-Functional Requirements
+[Include sections for Performance, Security, Scalability, Availability, Usability, Compatibility, Maintenance, etc.]
+
+### User Interface Requirements
+[Key screens and UI components]
+
+### Technical Requirements
+[System architecture, technology stack, etc.]
+
+### Project Budget and Limitations
+[From the BRD]
+
+### Project Acceptance Criteria
+[Clear criteria for project success]
+
+### Schedule and Milestones
+[Break down into phases with estimated timeframes]
+
+### Risk and Mitigation
+[Technical and business risks with mitigation strategies]
+
+### Glossary
+[Technical terms and definitions]
+
+Make sure to:
+1. Use the same detailed format for functional requirements as seen in the template
+2. Include user stories and acceptance criteria for each feature
+3. Maintain consistent formatting throughout
+4. Be specific about technical implementation details
+5. Adapt the template structure to fit the specific project in the BRD
+
+**NOTE: ENSURE FINAL OUTPUT ONLY CONTAINS MARKDOWN RESULT AND NOTHING ELSE.YOU MUST USE (```markdown) and (```) TO START AND END THE MARKDOWN RESULT.**
+"""
+
+# Model providers by model_type as (module, class, extra kwargs). Provider SDKs are
+# imported only when their model type is first requested; unknown types default to groq
+_MODEL_REGISTRY = {
+    "gemini": ("agno.models.google", "Gemini", {}),
+    "openai": ("agno.models.openai", "OpenAIChat", {}),
+    "openai_like": ("agno.models.openai.like", "OpenAILike", {"base_url": OPENAI_LIKE_BASE_URL, "api_key": OPENAI_LIKE_API_KEY}),
+    "mistral": ("agno.models.mistral", "MistralChat", {}),
+    "groq": ("agno.models.groq", "Groq", {}),
+}
+
+
+@functools.lru_cache(maxsize=16)
+def _get_model(model_type: str, model_id: str):
+    """Return a shared model client so its HTTP connections are reused."""
+    module_name, class_name, kwargs = _MODEL_REGISTRY.get(model_type.lower(), _MODEL_REGISTRY["groq"])
+    model_class = getattr(importlib.import_module(module_name), class_name)
+    return model_class(id=model_id, **kwargs)
+
+
+# Strong references to in-flight memory writes so they are not garbage collected
+_background_tasks = set()
+
+
+# Memory is shared by every agent and is not thread-safe, so worker-thread writes
+# are serialized
+_memory_write_lock = threading.Lock()
+
+
+def _write_user_memory(memory: Memory, user_id: str, user_memory: UserMemory):
+    with _memory_write_lock:
+        memory.add_user_memory(user_id=user_id, memory=user_memory)
+
+
+def _on_memory_write_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if task.cancelled():
+        logger.warning("⚠️ PRD memory write was cancelled before it completed")
+    elif task.exception():
+        logger.error(f"❌ PRD memory write failed: {task.exception()}")
+
+
+async def wait_for_memory_writes():
+    """
+    Wait for pending PRD memory writes to finish.
+    
+    generate_prd and stream_prd return before the PRD is stored in user memory.
+    Steps that rely on that memory, and scripts about to exit their event loop,
+    should await this first.
+    """
+    if _background_tasks:
+        await asyncio.gather(*list(_background_tasks), return_exceptions=True)
+
+
+def _extract_prd(content: str) -> str:
+    """
+    Return the text between the first and the last ``` marker.
+    
+    A lone marker is an opening fence whose closing marker never arrived (e.g. a
+    response cut off at the token limit), unless nothing follows it. Without any
+    marker the whole response is returned.
+    """
+    start = content.find("```")
+    if start == -1:
+        return content.strip()
+    end = content.rfind("```")
+    if end < start + 3:
+        if not content[start + 3:].strip():
+            return content[:start].strip()
+        end = len(content)
+    return content[start + 3:end].removeprefix("markdown").strip()
+
+
+class _MarkdownFenceStream:
+    """
+    Incrementally yield what _extract_prd returns for the complete response.
+    
+    Text after the latest ``` marker is held back until another marker arrives, since
+    it is only part of the PRD if that marker turns out not to be the last one. Call
+    close() once the response is complete for whatever is still held back.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._scan_from = 0
+        self._open_end = None  # index just past the opening marker
+        self._last_marker = None  # index of the latest marker after the opening one
+        self._emitted = None  # index up to which the PRD body has been yielded
+        self._emitted_len = 0  # number of PRD characters yielded so far
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk and return the PRD text that is now known to be final."""
+        self.text += chunk
+        text = self.text
+
+        while (i := text.find("```", self._scan_from)) != -1:
+            if self._open_end is None:
+                self._open_end = i + 3
+            else:
+                self._last_marker = i
+            self._scan_from = i + 3
+        # A marker may be split across chunks: rescan the last two characters next time
+        self._scan_from = max(self._scan_from, len(text) - 2)
+
+        if self._open_end is None:
+            return ""
+        if self._emitted is None:
+            rest = text[self._open_end:self._open_end + 8]
+            if len(rest) < 8 and "markdown".startswith(rest):
+                return ""
+            body_start = self._open_end + (8 if rest == "markdown" else 0)
+            while body_start < len(text) and text[body_start].isspace():
+                body_start += 1
+            if body_start == len(text):
+                return ""
+            self._emitted = body_start
+
+        limit = self._last_marker if self._last_marker is not None else len(text) - 2
+        # Trailing whitespace is only emitted once more content follows it
+        while limit > self._emitted and text[limit - 1].isspace():
+            limit -= 1
+        if limit <= self._emitted:
+            return ""
+        out = text[self._emitted:limit]
+        self._emitted = limit
+        self._emitted_len += len(out)
+        return out
+
+    def close(self) -> str:
+        """Return the rest of the PRD once the full response has been fed."""
+        return _extract_prd(self.text)[self._emitted_len:]
+
+
 class PRDGeneratorService:
     """Service for generating Product Requirements Documents (PRD)."""
 
@@ -49,116 +267,117 @@ class PRDGeneratorService:
         self.model_id = model_id or PRD_MODEL_ID
         
         # Initialize the model based on provider
-        if self.model_type.lower() == "gemini":
-            self.model = Gemini(id=self.model_id)
-        elif self.model_type.lower() == "openai":
-            self.model = OpenAIChat(id=self.model_id)
-        elif self.model_type.lower() == "openai_like":
-            self.model = OpenAILike(id=self.model_id, base_url=OPENAI_LIKE_BASE_URL, api_key=OPENAI_LIKE_API_KEY)
-        elif self.model_type.lower() == "mistral":
-            self.model = MistralChat(id=self.model_id)
-        else:  # Default to groq
-            self.model = Groq(id=self.model_id)
-        
-        # Load PRD template for reference if available
-        prd_template = ""
-        try:
-            template_path = os.path.join(os.path.dirname(__file__), "templates", "prd_template.md")
-            if os.path.exists(template_path):
-                with open(template_path, "r", encoding="utf-8") as f:
-                    prd_template = f.read()
-        except Exception as e:
-            logger.warning(f"PRD template loading failed: {e}. Proceeding without template.")
-        
+        self.model = _get_model(self.model_type, self.model_id)
         
         # Initialize Memory and Storage using singleton service
         self.memory = get_memory()
         self.storage = get_storage()
 
         # Initialize Agent
-        self.agent = Agent(
+        self.agent = self._create_agent()
+        logger.info(f"Initialized PRD Generator with {self.model_type} model (ID: {self.model_id})")
+
+    def _create_agent(self) -> Agent:
+        """Build a PRD agent. Agents hold per-run session state, so concurrent runs each need their own."""
+        return Agent(
             model=self.model,
             memory=self.memory,
             enable_agentic_memory=True,
             enable_user_memories=True,
             storage=self.storage,
             name="PRDGenerator",
-            instructions=f"""
-            You are TaskFlow, an expert product manager. Based on the provided Business Requirements Document (BRD),
-            create a comprehensive Product Requirements Document (PRD) in markdown format.
-            
-            PRD Template Reference:
+            instructions=_PRD_INSTRUCTIONS,
+            add_datetime_to_instructions=True,
+            reasoning=True,
+            show_tool_calls=ENABLE_SHOW_TOOL_CALLS,
+            debug_mode=ENABLE_DEBUG_MODE,
+            markdown=ENABLE_MARKDOWN
+        )
+
+    def _build_prompt(self, brd_content: str) -> str:
+        return f"""
+            BRD:
             ```markdown
-            {prd_template}
+            {brd_content}
             ```
-            
-            Create a detailed PRD following the structure of the template provided. Your PRD should include these sections with similar formatting and level of detail:
-
-            # PRODUCT REQUIREMENTS DOCUMENT (PRD)
-
-            ## [Project Name]
-
-            ### Introduction
-            [Brief introduction based on the BRD]
-
-            ### Product Description
-            [Detailed description of the product]
-
-            ### Product Objective
-            [Key objectives from the BRD]
-
-            ### Target User
-            [Detailed breakdown of target users with demographics]
-
-            ### Functional Requirements
-            [Organize by feature categories, similar to the template]
-            
-            For each functional requirement, include:
-            - Priority (High/Medium/Low)
-            - Description
-            - User Story (As a [user], I want to [action] so that [benefit])
-            - Acceptance Criteria (bullets of testable requirements)
+            """
 
-            ### Non-Functional Requirements
-            [Include sections for Performance, Security, Scalability, Availability, Usability, Compatibility, Maintenance, etc.]
-
-            ### User Interface Requirements
-            [Key screens and UI components]
-
-            ### Technical Requirements
-            [System architecture, technology stack, etc.]
-
-            ### Project Budget and Limitations
-            [From the BRD]
-
-            ### Project Acceptance Criteria
-            [Clear criteria for project success]
+    def _cache_keys(self, prompt: str) -> Tuple[str, str]:
+        """Exact-match cache key and semantic cache namespace for a prompt."""
+        return (
+            response_cache.make_key(self.model_id, self.agent.instructions, prompt),
+            response_cache.make_key(self.model_id, self.agent.instructions, ""),
+        )
 
-            ### Schedule and Milestones
-            [Break down into phases with estimated timeframes]
+    async def _get_cached_prd(self, prompt: str) -> Optional[str]:
+        """Look up a PRD for this exact prompt in the response cache."""
+        if not response_cache.is_cacheable(self.model):
+            return None
+        cache_key, _ = self._cache_keys(prompt)
+        return await response_cache.get(cache_key)
 
-            ### Risk and Mitigation
-            [Technical and business risks with mitigation strategies]
+    async def _get_similar_cached_prd(self, brd_content: str, prompt: str) -> Tuple[Optional[str], Optional[List[float]]]:
+        """
+        Look up the PRD of a near-duplicate BRD in the semantic cache.
+        
+        Returns:
+            Tuple of the cached PRD (or None) and the BRD embedding to reuse when storing a miss
+        """
+        cache_key, cache_namespace = self._cache_keys(prompt)
+        brd_embedding = await semantic_cache.embed(brd_content)
+        prd_content = await semantic_cache.lookup(cache_namespace, brd_embedding)
+        if prd_content is not None:
+            await response_cache.set(cache_key, prd_content)
+        return prd_content, brd_embedding
 
-            ### Glossary
-            [Technical terms and definitions]
+    async def _get_similar_or_generate_prd(self, agent: Agent, brd_content: str, prompt: str, user_id: str = None) -> str:
+        """Semantic cache lookup, then LLM call. Runs coalesced so identical BRDs embed only once."""
+        # A generation that finished just before this one was coalesced may have filled the cache
+        prd_content = await self._get_cached_prd(prompt)
+        if prd_content is not None:
+            return prd_content
+        prd_content, brd_embedding = await self._get_similar_cached_prd(brd_content, prompt)
+        if prd_content is not None:
+            return prd_content
+        return await self._generate_prd_content(agent, prompt, brd_embedding, user_id)
 
-            Make sure to:
-            1. Use the same detailed format for functional requirements as seen in the template
-            2. Include user stories and acceptance criteria for each feature
-            3. Maintain consistent formatting throughout
-            4. Be specific about technical implementation details
-            5. Adapt the template structure to fit the specific project in the BRD
+    async def _cache_prd(self, prompt: str, brd_embedding: Optional[List[float]], prd_content: str):
+        if not response_cache.is_cacheable(self.model):
+            return
+        cache_key, cache_namespace = self._cache_keys(prompt)
+        await response_cache.set(cache_key, prd_content)
+        await semantic_cache.store(cache_namespace, brd_embedding, prd_content)
 
-            **NOTE: ENSURE FINAL OUTPUT ONLY CONTAINS MARKDOWN RESULT AND NOTHING ELSE.YOU MUST USE (```markdown) and (```) TO START AND END THE MARKDOWN RESULT.**
+    def _remember_prd(self, user_id: str, prd_content: str):
+        """
+        Persist the PRD to user memory after the response has been returned.
+        
+        The write is not awaited, so callers cannot rely on the PRD being in memory
+        until wait_for_memory_writes() has been awaited.
+        """
+        memory = UserMemory(
+            memory=f"""
+            Project PRD:
+            ```markdown
+            {prd_content}
+            ```
             """,
-            add_datetime_to_instructions=True,
-            reasoning=True,
-            show_tool_calls=ENABLE_SHOW_TOOL_CALLS,
-            debug_mode=ENABLE_DEBUG_MODE,
-            markdown=ENABLE_MARKDOWN
+            topics=["PRD", "Product Requirements Document"],
         )
-        logger.info(f"Initialized PRD Generator with {self.model_type} model (ID: {self.model_id})")
+        # add_user_memory does blocking database I/O, so it runs in a worker thread
+        task = asyncio.create_task(asyncio.to_thread(_write_user_memory, self.memory, user_id, memory))
+        _background_tasks.add(task)
+        task.add_done_callback(_on_memory_write_done)
+
+    async def _generate_prd_content(self, agent: Agent, prompt: str, brd_embedding: Optional[List[float]], user_id: str = None) -> str:
+        """Call the LLM (with retries), extract the PRD markdown and cache it."""
+        prd_response = await retry_async(
+            lambda: agent.arun(prompt, user_id=user_id, session_id=f"{user_id}_prd" if user_id else None)
+        )
+        prd_content = _extract_prd(prd_response.content)
+
+        await self._cache_prd(prompt, brd_embedding, prd_content)
+        return prd_content
 
     async def generate_prd(self, brd_content: str, project_name: str = "Unnamed Project", user_id: str = None) -> Dict[str, Any]:
         """
@@ -174,31 +393,30 @@ class PRDGeneratorService:
         Raises:
             ValueError: If PRD generation fails
         """
+        return await self._generate_prd(self.agent, brd_content, project_name, user_id)
+
+    async def _generate_prd(self, agent: Agent, brd_content: str, project_name: str = "Unnamed Project", user_id: str = None) -> Dict[str, Any]:
         logger.info(f"Generating PRD for project: {project_name}")
         
         try:
-            prd_response = await self.agent.arun(f"""
-            BRD:
-            ```markdown
-            {brd_content}
-            ```
-            """, user_id=user_id, session_id=f"{user_id}_prd" if user_id else None)
-            prd_content = prd_response.content.strip()
+            prompt = self._build_prompt(brd_content)
 
-            # Extract content between ``` markers using regex
-            match = re.search(r"```(?:markdown)?([\s\S]*?)```\s*$", prd_content, re.MULTILINE)
-            if match:
-                prd_content = match.group(1).strip()
+            # Identical BRDs are served from the response cache instead of the LLM,
+            # near-duplicates from the semantic cache behind it
+            prd_content = await self._get_cached_prd(prompt)
+
+            if prd_content is not None:
+                logger.info(f"PRD cache hit for project: {project_name}")
+            elif response_cache.is_cacheable(self.model):
+                # Identical BRDs arriving concurrently share one embedding and LLM call
+                cache_key, _ = self._cache_keys(prompt)
+                prd_content = await response_cache.coalesce(
+                    cache_key, lambda: self._get_similar_or_generate_prd(agent, brd_content, prompt, user_id)
+                )
+            else:
+                prd_content = await self._generate_prd_content(agent, prompt, None, user_id)
             
-            self.memory.add_user_memory(user_id=user_id, memory=UserMemory(
-                memory=f"""
-                Project PRD:
-                ```markdown
-                {prd_content}
-                ```
-                """,
-                topics=["PRD", "Product Requirements Document"],
-            ))
+            self._remember_prd(user_id, prd_content)
             logger.info(f"✅ Successfully generated PRD for {project_name}")
             
             return {
@@ -212,4 +430,87 @@ class PRDGeneratorService:
             return {
                 "status": "error",
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+
+    async def stream_prd(self, brd_content: str, project_name: str = "Unnamed Project", user_id: str = None) -> AsyncIterator[str]:
+        """
+        Stream a PRD based on a BRD, yielding markdown as the model produces it.
+        
+        Only the content of the markdown fence is yielded, so the result can be passed
+        straight to a FastAPI StreamingResponse. The chunks add up to the content
+        generate_prd would return. A cached PRD is yielded as one chunk.
+        
+        Args:
+            brd_content: Content of the BRD document
+            project_name: Name of the project
+            user_id: Optional user/project ID for memory and session tracking
+            
+        Yields:
+            Chunks of PRD markdown
+        """
+        logger.info(f"Streaming PRD for project: {project_name}")
+        prompt = self._build_prompt(brd_content)
+        prd_content, brd_embedding = await self._get_cached_prd(prompt), None
+        if prd_content is None and response_cache.is_cacheable(self.model):
+            prd_content, brd_embedding = await self._get_similar_cached_prd(brd_content, prompt)
+
+        if prd_content is not None:
+            logger.info(f"PRD cache hit for project: {project_name}")
+            yield prd_content
+        else:
+            parser = _MarkdownFenceStream()
+            stream = await self.agent.arun(prompt, stream=True, user_id=user_id, session_id=f"{user_id}_prd" if user_id else None)
+            async for chunk in stream:
+                if chunk.event != RunEvent.run_response.value or not isinstance(chunk.content, str):
+                    continue
+                text = parser.feed(chunk.content)
+                if text:
+                    yield text
+            text = parser.close()
+            if text:
+                yield text
+
+            # Cache exactly what generate_prd would have extracted from the full response
+            prd_content = _extract_prd(parser.text)
+            await self._cache_prd(prompt, brd_embedding, prd_content)
+
+        self._remember_prd(user_id, prd_content)
+        logger.info(f"✅ Successfully streamed PRD for {project_name}")
+
+    async def generate_prd_batch(self, items: List[Dict[str, Any]], concurrency: int = None) -> List[Dict[str, Any]]:
+        """
+        Generate PRDs for many BRDs concurrently.
+        
+        Each item runs on its own agent so concurrent runs for different users do not
+        share session state.
+        
+        Args:
+            items: List of dicts with generate_prd arguments ('brd_content', and optionally 'project_name' and 'user_id')
+            concurrency: Maximum number of in-flight LLM calls (defaults to PRD_BATCH_CONCURRENCY)
+            
+        Returns:
+            List of generate_prd results in the same order as items
+        """
+        concurrency = max(1, min(concurrency or PRD_BATCH_CONCURRENCY, PRD_BATCH_CONCURRENCY))
+        sem = asyncio.Semaphore(concurrency)
+        logger.info(f"Generating {len(items)} PRDs with concurrency {concurrency}")
+
+        async def _generate(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with sem:
+                return await self._generate_prd(self._create_agent(), **item)
+
+        results = await asyncio.gather(*(_generate(item) for item in items), return_exceptions=True)
+        return [
+            {"status": "error", "error": str(result)} if isinstance(result, BaseException) else result
+            for result in results
+        ]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_prd_generator(model_type: str, model_id: str) -> PRDGeneratorService:
+    return PRDGeneratorService(model_type, model_id)
+
+
+def get_prd_generator(model_type: str = None, model_id: str = None) -> PRDGeneratorService:
+    """Return the shared PRDGeneratorService for a model, creating it on first use."""
+    return _get_prd_generator(model_type or PRD_MODEL_TYPE, model_id or PRD_MODEL_ID)
@@ -0,0 +1,171 @@
+"""
+Exact-match response cache for LLM generations.
+
+Uses Redis when REDIS_URL is configured and the redis package is installed,
+otherwise falls back to a local SQLite database.
+"""
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from .config import (
+    ENABLE_RESPONSE_CACHE,
+    RESPONSE_CACHE_TTL,
+    REDIS_URL,
+    RESPONSE_CACHE_DB_PATH,
+)
+
+try:
+    from redis.asyncio import Redis
+except ImportError:  # redis is optional
+    Redis = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Generations currently running, keyed on their cache key
+_in_flight: Dict[str, asyncio.Future] = {}
+
+
+def make_key(model_id: str, system_instructions: str, prompt: str) -> str:
+    """Build a deterministic cache key from the model and its full input."""
+    return hashlib.sha256(f"{model_id}|{system_instructions}|{prompt}".encode()).hexdigest()
+
+
+def is_cacheable(model) -> bool:
+    """Only cache deterministic generations (no explicit non-zero temperature)."""
+    if not ENABLE_RESPONSE_CACHE:
+        return False
+    temperature = getattr(model, "temperature", None)
+    return temperature is None or temperature == 0
+
+
+class _RedisBackend:
+    def __init__(self, url: str):
+        self._client = Redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl: int):
+        await self._client.set(key, value, ex=ttl)
+
+
+class _SQLiteBackend:
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return row[0]
+
+    def _set(self, key: str, value: str, ttl: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            self._conn.execute("DELETE FROM response_cache WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str, ttl: int):
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if REDIS_URL and Redis is not None:
+                    _backend = _RedisBackend(REDIS_URL)
+                    logger.info("Response cache using Redis backend")
+                else:
+                    if REDIS_URL:
+                        logger.warning(
+                            "REDIS_URL is set but the redis package is not installed; "
+                            "falling back to the local SQLite response cache (not shared across hosts)"
+                        )
+                    _backend = _SQLiteBackend(RESPONSE_CACHE_DB_PATH)
+                    logger.info(f"Response cache using SQLite backend ({RESPONSE_CACHE_DB_PATH})")
+    return _backend
+
+
+async def get(key: str) -> Optional[str]:
+    """Return the cached value for key, or None on miss or cache failure."""
+    try:
+        return await _get_backend().get(key)
+    except Exception as e:
+        logger.warning(f"Response cache read failed: {e}")
+        return None
+
+
+async def set(key: str, value: str, ttl: int = RESPONSE_CACHE_TTL):
+    """Store value under key for ttl seconds. Failures are logged, not raised."""
+    try:
+        await _get_backend().set(key, value, ttl)
+    except Exception as e:
+        logger.warning(f"Response cache write failed: {e}")
+
+
+async def coalesce(key: str, func: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run func() at most once at a time per key.
+    
+    Concurrent callers with the same key await the in-flight result instead of
+    starting their own generation (cache stampede protection). If the caller running
+    the generation is cancelled, a waiting caller takes over rather than being
+    cancelled with it.
+    """
+    while (existing := _in_flight.get(key)) is not None:
+        logger.info("Awaiting in-flight generation for identical request")
+        try:
+            return await asyncio.shield(existing)
+        except asyncio.CancelledError:
+            # Only the caller running the generation was cancelled: take over from it
+            if existing.cancelled() and not asyncio.current_task().cancelling():
+                continue
+            raise
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    try:
+        result = await func()
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(e)
+            future.exception()  # mark as retrieved when nobody else is waiting
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _in_flight.pop(key, None)
@@ -0,0 +1,126 @@
+"""
+Semantic response cache for LLM generations.
+
+Sits behind the exact-match response cache: inputs are embedded and the stored
+response of the nearest previous input is reused when the cosine similarity is
+above SEMANTIC_CACHE_THRESHOLD. Entries live in the same SQLite file as the
+exact-match fallback backend and are scanned in-process, so SEMANTIC_CACHE_MAX_ENTRIES
+bounds the per-lookup cost.
+"""
+import array
+import asyncio
+import logging
+import math
+import operator
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from .config import (
+    ENABLE_SEMANTIC_CACHE,
+    SEMANTIC_CACHE_EMBEDDING_MODEL,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_DB_PATH,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(vector: List[float]) -> array.array:
+    norm = math.sqrt(sum(map(operator.mul, vector, vector))) or 1.0
+    return array.array("d", (x / norm for x in vector))
+
+
+class _SemanticStore:
+    def __init__(self, path: str):
+        from agno.embedder.openai import OpenAIEmbedder
+
+        self._embedder = OpenAIEmbedder(id=SEMANTIC_CACHE_EMBEDDING_MODEL)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS semantic_cache "
+            "(id INTEGER PRIMARY KEY AUTOINCREMENT, namespace TEXT NOT NULL, embedding BLOB NOT NULL, "
+            "value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS semantic_cache_namespace ON semantic_cache (namespace)")
+        self._conn.commit()
+
+    def embed(self, text: str) -> List[float]:
+        return self._embedder.get_embedding(text)
+
+    def lookup(self, namespace: str, embedding: List[float]) -> Optional[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT embedding, value FROM semantic_cache WHERE namespace = ? AND expires_at >= ? "
+                "ORDER BY id DESC LIMIT ?",
+                (namespace, time.time(), SEMANTIC_CACHE_MAX_ENTRIES),
+            ).fetchall()
+
+        # Stored vectors are unit length, so cosine similarity is a plain dot product
+        query = _normalize(embedding)
+        best_value, best_score = None, SEMANTIC_CACHE_THRESHOLD
+        for blob, value in rows:
+            score = sum(map(operator.mul, query, array.array("d", blob)))
+            if score >= best_score:
+                best_value, best_score = value, score
+        if best_value is not None:
+            logger.info(f"Semantic cache hit (similarity {best_score:.3f})")
+        return best_value
+
+    def store(self, namespace: str, embedding: List[float], value: str, ttl: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO semantic_cache (namespace, embedding, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, _normalize(embedding).tobytes(), value, time.time() + ttl),
+            )
+            self._conn.execute("DELETE FROM semantic_cache WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _get_store() -> _SemanticStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _SemanticStore(RESPONSE_CACHE_DB_PATH)
+    return _store
+
+
+async def embed(text: str) -> Optional[List[float]]:
+    """Embed text for lookup/store. Returns None when disabled or on failure."""
+    if not ENABLE_SEMANTIC_CACHE:
+        return None
+    try:
+        return await asyncio.to_thread(_get_store().embed, text)
+    except Exception as e:
+        logger.warning(f"Semantic cache embedding failed: {e}")
+        return None
+
+
+async def lookup(namespace: str, embedding: Optional[List[float]]) -> Optional[str]:
+    """Return the stored value of the most similar entry in namespace, if any."""
+    if embedding is None:
+        return None
+    try:
+        return await asyncio.to_thread(_get_store().lookup, namespace, embedding)
+    except Exception as e:
+        logger.warning(f"Semantic cache read failed: {e}")
+        return None
+
+
+async def store(namespace: str, embedding: Optional[List[float]], value: str, ttl: int = RESPONSE_CACHE_TTL):
+    """Store value under embedding in namespace. Failures are logged, not raised."""
+    if embedding is None:
+        return
+    try:
+        await asyncio.to_thread(_get_store().store, namespace, embedding, value, ttl)
+    except Exception as e:
+        logger.warning(f"Semantic cache write failed: {e}")
@@ -4,13 +4,21 @@ Utility functions for AI services.
 import os
 import json
 import re
+import random
+import asyncio
 import logging
 import datetime
-from typing import Dict, Any, List
+import httpx
+from typing import Dict, Any, List, Awaitable, Callable, TypeVar
 from uuid import uuid4
 
 # Import the RESULTS_DIR from services config
-from ..services.config import RESULTS_DIR
+from ..services.config import RESULTS_DIR, LLM_MAX_RETRIES, LLM_RETRY_BASE_DELAY
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying besides 5xx: timeouts, conflicts and rate limits
+_TRANSIENT_STATUS_CODES = {408, 409, 425, 429}
 
 # Set up logging
 logging.basicConfig(
@@ -138,4 +146,57 @@ def save_markdown(markdown_content: str, base_filename: str) -> str:
     with open(full_path, "w", encoding="utf-8") as f:
         f.write(markdown_content)
     
-    logger.info(f"✅ Markdown saved to: {full_path}") 
\ No newline at end of file
+    logger.info(f"✅ Markdown saved to: {full_path}")
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Check whether a failed LLM call may succeed when retried.
+    
+    Network errors, timeouts, rate limits and server errors are transient; client
+    errors such as bad requests or invalid credentials fail the same way every time.
+    
+    Args:
+        error: The exception raised by the call
+        
+    Returns:
+        True if the call should be retried
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status_code, int):
+        return status_code in _TRANSIENT_STATUS_CODES or status_code >= 500
+    return isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError, httpx.TransportError))
+
+
+async def retry_async(
+    func: Callable[[], Awaitable[T]],
+    attempts: int = LLM_MAX_RETRIES,
+    base_delay: float = LLM_RETRY_BASE_DELAY,
+    retry_if: Callable[[Exception], bool] = is_transient_error,
+) -> T:
+    """
+    Await func(), retrying failures with exponential backoff and jitter.
+    
+    Args:
+        func: Zero-argument callable returning a fresh awaitable on each call
+        attempts: Total number of attempts before giving up
+        base_delay: Delay in seconds before the first retry, doubled on each retry
+        retry_if: Predicate deciding whether an error is worth retrying (transient errors by default)
+        
+    Returns:
+        The result of the first successful call
+        
+    Raises:
+        Exception: The first error that is not retried, or the last error if all attempts fail
+    """
+    for attempt in range(1, max(1, attempts) + 1):
+        try:
+            return await func()
+        except Exception as e:
+            if attempt >= attempts or not retry_if(e):
+                raise
+            delay = base_delay * 2 ** (attempt - 1) * (1 + random.random() / 2)
+            logger.warning(f"⚠️ Attempt {attempt}/{attempts} failed: {e}. Retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
@@ -2,6 +2,7 @@
 Background task functions for AI generation services.
 """
 from ..config import supabase, brd_service, prd_service, task_service, market_validation_service, github_setup_service, preview_service
+from ..services.prd_generator import wait_for_memory_writes
 from .ai_utils import llm_to_tasks
 
 async def generate_brd_background(project_id: str, project_data: dict):
@@ -35,6 +36,8 @@ async def generate_prd_background(project_id: str, brd_content: str, project_nam
             project_name,
             project_id
         )
+        # Later steps for this project read the PRD back from user memory
+        await wait_for_memory_writes()
         
         if prd_result['status'] == 'success':
             # Update the PRD record with the content and 'completed' status
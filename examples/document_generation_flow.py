@@ -20,7 +20,7 @@ from typing import Dict, Any
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.services.brd_generator import BRDGeneratorService
-from app.services.prd_generator import PRDGeneratorService
+from app.services.prd_generator import get_prd_generator, wait_for_memory_writes
 from app.services.task_generator import TaskGeneratorService
 from app.services.market_validation import MarketValidationService
 from app.utils.ai_utils import save_markdown, save_to_file
@@ -75,8 +75,10 @@ async def run_full_document_flow(project_details: Dict[str, Any]) -> Dict[str, A
     
     # Step 2: Generate PRD from BRD
     logger.info("Step 2: Generating Product Requirements Document (PRD)")
-    prd_service = PRDGeneratorService()
+    prd_service = get_prd_generator()
     prd_result = await prd_service.generate_prd(brd_result["content"], project_name, project_id)
+    # The PRD is written to user memory in the background; later steps rely on it
+    await wait_for_memory_writes()
     
     if prd_result["status"] != "success":
         logger.error(f"❌ PRD generation failed: {prd_result.get('error', 'Unknown error')}")
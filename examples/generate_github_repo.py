@@ -10,7 +10,7 @@ from dotenv import load_dotenv
 
 # Add the project root directory to the Python path if running as script
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from app.services.github_setup import GitHubSetupService
+from app.services.github_setup import get_github_setup_service
 
 # Load environment variables
 load_dotenv()
@@ -36,7 +36,7 @@ async def main():
     
     try:
         # Initialize the GitHub setup service
-        github_service = GitHubSetupService()
+        github_service = get_github_setup_service()
         
         # Random UUID
         project_id = "28cf12ac-2f5e-4dd5-99b6-26a889f42a45"
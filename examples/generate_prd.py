@@ -14,7 +14,7 @@ from typing import Dict, Any
 # Add the project root directory to the Python path if running as script
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.services.prd_generator import PRDGeneratorService
+from app.services.prd_generator import get_prd_generator, wait_for_memory_writes
 from app.utils.ai_utils import save_markdown
 
 # Configure logging
@@ -40,7 +40,7 @@ async def generate_prd(brd_content: str, project_name: str, save_to_file: bool =
     logger.info(f"Generating PRD for project: {project_name}")
     
     # Initialize the service
-    prd_service = PRDGeneratorService()
+    prd_service = get_prd_generator()
 
     # Random UUID
     project_id = "28cf12ac-2f5e-4dd5-99b6-26a889f42a45"
@@ -48,6 +48,8 @@ async def generate_prd(brd_content: str, project_name: str, save_to_file: bool =
     
     # Generate PRD
     result = await prd_service.generate_prd(brd_content, project_name, project_id)
+    # Let the background memory write finish before asyncio.run() tears down the loop
+    await wait_for_memory_writes()
     
     # Check result
     if result["status"] == "success":
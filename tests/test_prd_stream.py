@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip("agno")
+
+from app.services.prd_generator import _MarkdownFenceStream, _extract_prd
+
+RESPONSES = [
+    "Here is the PRD:\n```markdown\n# PRD\n\n## Intro\ntext\n```\nHope this helps!",
+    "```markdown\n# PRD\n```python\nprint('hi')\n```\nmore\n```",
+    "```markdown # PRD one line ```",
+    "# PRD\n\nNo fence at all",
+    "```markdown\n# PRD\nunterminated body",
+    "# PRD\nbody before a lone closing fence\n```",
+    "",
+]
+
+
+@pytest.mark.parametrize("response", RESPONSES)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 100])
+def test_stream_matches_extract_prd(response, chunk_size):
+    parser = _MarkdownFenceStream()
+    streamed = "".join(parser.feed(response[i:i + chunk_size]) for i in range(0, len(response), chunk_size))
+    streamed += parser.close()
+    assert streamed == _extract_prd(response)